@@ -4,46 +4,57 @@ Tokenizes, parses, and evaluates arithmetic + variable expressions.
 Covers: Lexical Analysis, Parsing (Recursive Descent), AST, Evaluation.
 """
 
+import operator
 import re
+import string
 from dataclasses import dataclass
-from typing import Any, Optional
+from itertools import count
+from enum import IntEnum, auto
+from typing import Any
+
+try:
+    from numba import njit
+except ImportError:          # numba is optional; the VM is always available
+    njit = None
 
 
 # ─────────────────────────────────────────────
 # TOKENS
 # ─────────────────────────────────────────────
 
-class TokenType:
-    NUMBER   = "NUMBER"
-    IDENT    = "IDENT"
-    PLUS     = "PLUS"
-    MINUS    = "MINUS"
-    MUL      = "MUL"
-    DIV      = "DIV"
-    MOD      = "MOD"
-    POW      = "POW"
-    ASSIGN   = "ASSIGN"
-    EQ       = "EQ"
-    NEQ      = "NEQ"
-    LT       = "LT"
-    GT       = "GT"
-    LTE      = "LTE"
-    GTE      = "GTE"
-    LPAREN   = "LPAREN"
-    RPAREN   = "RPAREN"
-    PRINT    = "PRINT"
-    IF       = "IF"
-    ELSE     = "ELSE"
-    WHILE    = "WHILE"
-    LBRACE   = "LBRACE"
-    RBRACE   = "RBRACE"
-    SEMICOL  = "SEMICOL"
-    EOF      = "EOF"
+class TokenType(IntEnum):
+    """Small-int token types: the parser's hot `tok.type ==` predicates
+    compare at C level instead of hashing strings."""
+    NUMBER   = auto()
+    IDENT    = auto()
+    PLUS     = auto()
+    MINUS    = auto()
+    MUL      = auto()
+    DIV      = auto()
+    MOD      = auto()
+    POW      = auto()
+    ASSIGN   = auto()
+    EQ       = auto()
+    NEQ      = auto()
+    LT       = auto()
+    GT       = auto()
+    LTE      = auto()
+    GTE      = auto()
+    LPAREN   = auto()
+    RPAREN   = auto()
+    PRINT    = auto()
+    IF       = auto()
+    ELSE     = auto()
+    WHILE    = auto()
+    LBRACE   = auto()
+    RBRACE   = auto()
+    SEMICOL  = auto()
+    EOF      = auto()
 
 
 @dataclass
 class Token:
-    type: str
+    type: TokenType
     value: Any
     line: int = 0
 
@@ -52,10 +63,15 @@ class Token:
 # LEXER
 # ─────────────────────────────────────────────
 
-KEYWORDS = {"print", "if", "else", "while"}
+KEYWORDS = {
+    "print": TokenType.PRINT,
+    "if":    TokenType.IF,
+    "else":  TokenType.ELSE,
+    "while": TokenType.WHILE,
+}
 
-TOKEN_PATTERNS = [
-    (r'\d+(\.\d+)?',  TokenType.NUMBER),
+_RAW_PATTERNS = [
+    (r'\d+(?:\.\d+)?', TokenType.NUMBER),
     (r'[a-zA-Z_]\w*', TokenType.IDENT),
     (r'==',           TokenType.EQ),
     (r'!=',           TokenType.NEQ),
@@ -77,6 +93,77 @@ TOKEN_PATTERNS = [
     (r';',            TokenType.SEMICOL),
 ]
 
+# Each pattern compiled exactly once at import time; nothing below ever
+# feeds a raw string through re's internal (locked, 512-entry) cache.
+TOKEN_PATTERNS = [(re.compile(p), t) for p, t in _RAW_PATTERNS]
+
+# Skip rule folded into the same regex so the whole lexer advances with a
+# single C-level match per step; the outer '+' swallows a whole run of
+# whitespace and line comments in one match instead of one per stretch.
+_RAW_SKIP = [
+    (r'(?:\s+|//[^\n]*)+', "SKIP"),
+]
+
+SKIP_PATTERNS = [(re.compile(p), t) for p, t in _RAW_SKIP]
+
+def _group_name(name):
+    # Regex group names must be identifiers: TokenType members use their
+    # .name, the WS/COMMENT skip rules already are strings.
+    return name.name if isinstance(name, TokenType) else name
+
+
+MASTER_RE = re.compile('|'.join(
+    f'(?P<{_group_name(name)}>{pattern})'
+    for pattern, name in _RAW_SKIP + _RAW_PATTERNS
+))
+
+# Most tokens in this grammar are one character long; a dict lookup on the
+# current character is much cheaper than a regex call for those.
+SINGLE_CHAR = {
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MUL,
+    '/': TokenType.DIV,
+    '%': TokenType.MOD,
+    '=': TokenType.ASSIGN,
+    '<': TokenType.LT,
+    '>': TokenType.GT,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    ';': TokenType.SEMICOL,
+}
+
+# Pairs that must NOT be split by the single-char fast path ('//' starts a
+# comment, the rest are two-char operators), keyed by their first char.
+TWO_CHAR = {'=': '==', '<': '<=', '>': '>=', '*': '**', '/': '//'}
+
+
+def _start_chars(pattern, name):
+    """Characters a pattern can start with (ASCII only)."""
+    if name == "SKIP":
+        return ' \t\n\r\f\v/'
+    if name == TokenType.NUMBER:
+        return string.digits
+    if name == TokenType.IDENT:
+        return string.ascii_letters + '_'
+    # Operators and comments start with their (possibly escaped) first literal.
+    return pattern[1] if pattern.startswith('\\') else pattern[0]
+
+
+def _build_start_table():
+    """128-entry table: ord(first char) -> regex over only the patterns
+    that can start with that character (alternation order preserved)."""
+    buckets = [[] for _ in range(128)]
+    for pattern, name in _RAW_SKIP + _RAW_PATTERNS:
+        for ch in _start_chars(pattern, name):
+            buckets[ord(ch)].append(f'(?P<{_group_name(name)}>{pattern})')
+    return [re.compile('|'.join(pats)) if pats else None for pats in buckets]
+
+
+START_TABLE = _build_start_table()
+
 
 class Lexer:
     def __init__(self, source):
@@ -89,36 +176,65 @@ class Lexer:
         raise SyntaxError(f"[Lexer] Unknown character '{char}' at line {self.line}")
 
     def tokenize(self):
-        while self.pos < len(self.source):
-            # Skip whitespace
-            if self.source[self.pos].isspace():
-                if self.source[self.pos] == '\n':
-                    self.line += 1
-                self.pos += 1
+        """Single tight scan loop over the precompiled automatons.
+
+        re.Scanner was considered here: it walks the same compiled SRE
+        alternation, but fires a Python callback per token and loses line
+        tracking. The named-group tables give us the C-level automaton
+        without the callback, so the remaining cost is this loop itself --
+        hence everything hot is bound to locals for the duration.
+        """
+        source = self.source
+        n = len(source)
+        append = self.tokens.append
+        pos = self.pos
+        line = self.line
+        single = SINGLE_CHAR
+        two = TWO_CHAR
+        table = START_TABLE
+
+        while pos < n:
+            # Fast path: single-character tokens skip the regex entirely,
+            # unless the next character would make a two-char operator.
+            c = source[pos]
+            ttype = single.get(c)
+            if ttype is not None:
+                pair = two.get(c)
+                if pair is None or not source.startswith(pair, pos):
+                    append(Token(ttype, c, line))
+                    pos += 1
+                    continue
+
+            # Only try the patterns that can start with this character
+            # (non-ASCII falls back to the full alternation, e.g. for
+            # unicode whitespace).
+            o = ord(c)
+            candidate = table[o] if o < 128 else MASTER_RE
+            m = candidate.match(source, pos) if candidate is not None else None
+            if m is None:
+                self.pos, self.line = pos, line
+                self.error(c)
+
+            group = m.lastgroup
+            val = m.group()
+            pos = m.end()
+
+            if group == "SKIP":
+                line += val.count('\n')
                 continue
-            # Skip comments
-            if self.source[self.pos:self.pos+2] == '//':
-                while self.pos < len(self.source) and self.source[self.pos] != '\n':
-                    self.pos += 1
-                continue
-
-            matched = False
-            for pattern, ttype in TOKEN_PATTERNS:
-                m = re.match(pattern, self.source[self.pos:])
-                if m:
-                    val = m.group(0)
-                    if ttype == TokenType.NUMBER:
-                        val = float(val) if '.' in val else int(val)
-                    elif ttype == TokenType.IDENT and val in KEYWORDS:
-                        ttype = val.upper()
-                    self.tokens.append(Token(ttype, val, self.line))
-                    self.pos += len(m.group(0))
-                    matched = True
-                    break
-            if not matched:
-                self.error(self.source[self.pos])
 
-        self.tokens.append(Token(TokenType.EOF, None, self.line))
+            ttype = TokenType[group]
+            if ttype == TokenType.NUMBER:
+                val = float(val) if '.' in val else int(val)
+            elif ttype == TokenType.IDENT:
+                keyword = KEYWORDS.get(val)
+                if keyword is not None:
+                    ttype = keyword
+            append(Token(ttype, val, line))
+
+        self.pos = pos
+        self.line = line
+        append(Token(TokenType.EOF, None, line))
         return self.tokens
 
 
@@ -126,93 +242,209 @@ class Lexer:
 # AST NODES
 # ─────────────────────────────────────────────
 
-@dataclass
-class NumberNode:
-    value: float
+def _div(a, b):
+    if b == 0:
+        raise ZeroDivisionError("Division by zero")
+    return a / b
+
+
+# One shared table of operator functions, bound onto BinOpNode at parse
+# time so evaluation is a single attribute load + C-level call.
+BIN_OPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": _div,
+    "%": operator.mod,
+    "**": operator.pow,
+    # Comparisons return native bool (an int subclass); print boxes to 0/1.
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
 
-@dataclass
-class VarNode:
-    name: str
 
-@dataclass
-class BinOpNode:
-    left: Any
-    op: str
-    right: Any
+class Node:
+    """AST base class. __slots__ drops the per-instance __dict__ (the
+    evaluator does little but attribute loads on these) and skips the
+    dataclass-generated __eq__; __repr__ is kept so show_ast still works."""
+    __slots__ = ()
 
-@dataclass
-class UnaryNode:
-    op: str
-    operand: Any
+    def __repr__(self):
+        fields = ", ".join(f"{s}={getattr(self, s)!r}" for s in self.__slots__)
+        return f"{type(self).__name__}({fields})"
 
-@dataclass
-class AssignNode:
-    name: str
-    value: Any
 
-@dataclass
-class PrintNode:
-    expr: Any
+class NumberNode(Node):
+    __slots__ = ('value',)
 
-@dataclass
-class IfNode:
-    condition: Any
-    then_body: list
-    else_body: Optional[list]
+    def __init__(self, value):
+        self.value = value
 
-@dataclass
-class WhileNode:
-    condition: Any
-    body: list
 
-@dataclass
-class BlockNode:
-    statements: list
+class VarNode(Node):
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+
+class BinOpNode(Node):
+    __slots__ = ('left', 'op', 'right', 'op_fn')
+
+    def __init__(self, left, op, right):
+        self.left = left
+        self.op = op
+        self.right = right
+        self.op_fn = BIN_OPS[op]
+
+
+class UnaryNode(Node):
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op, operand):
+        self.op = op
+        self.operand = operand
+
+
+class AssignNode(Node):
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+class PrintNode(Node):
+    __slots__ = ('expr',)
+
+    def __init__(self, expr):
+        self.expr = expr
+
+
+class IfNode(Node):
+    __slots__ = ('condition', 'then_body', 'else_body')
+
+    def __init__(self, condition, then_body, else_body):
+        self.condition = condition
+        self.then_body = then_body
+        self.else_body = else_body
+
+
+class WhileNode(Node):
+    __slots__ = ('condition', 'body')
+
+    def __init__(self, condition, body):
+        self.condition = condition
+        self.body = body
+
+
+class BlockNode(Node):
+    __slots__ = ('statements',)
+
+    def __init__(self, statements):
+        self.statements = statements
+
+
+# Shared nodes for small integer literals (mirroring CPython's small-int
+# cache). AST nodes are never mutated after parsing, so reuse is safe.
+_NUM_CACHE = [NumberNode(i) for i in range(256)]
+
+
+def _make_number(value):
+    if type(value) is int and 0 <= value < 256:
+        return _NUM_CACHE[value]
+    return NumberNode(value)
 
 
 # ─────────────────────────────────────────────
 # PARSER (Recursive Descent)
 # ─────────────────────────────────────────────
 
+def _fold(node):
+    """Collapse a constant BinOp/Unary subtree into a single NumberNode,
+    so expressions like 3 * 5 cost nothing at run time (especially inside
+    loops). Division by zero is left in the tree to fail at run time."""
+    if isinstance(node, BinOpNode):
+        if isinstance(node.left, NumberNode) and isinstance(node.right, NumberNode):
+            try:
+                return _make_number(node.op_fn(node.left.value, node.right.value))
+            except ZeroDivisionError:
+                return node
+    elif isinstance(node, UnaryNode):
+        if node.op == "-" and isinstance(node.operand, NumberNode):
+            return _make_number(-node.operand.value)
+    return node
+
+
+# Binary operator precedence: token type -> (level, op string). All six
+# comparisons share one level, matching the old comparison() rule.
+PRECEDENCE = {
+    TokenType.EQ:    (1, "=="),
+    TokenType.NEQ:   (1, "!="),
+    TokenType.LT:    (1, "<"),
+    TokenType.GT:    (1, ">"),
+    TokenType.LTE:   (1, "<="),
+    TokenType.GTE:   (1, ">="),
+    TokenType.PLUS:  (2, "+"),
+    TokenType.MINUS: (2, "-"),
+    TokenType.MUL:   (3, "*"),
+    TokenType.DIV:   (3, "/"),
+    TokenType.MOD:   (3, "%"),
+    TokenType.POW:   (4, "**"),
+}
+
+
 class Parser:
     def __init__(self, tokens):
         self.tokens = tokens
         self.pos = 0
+        # Current and next token as plain attributes: the hot predicates
+        # become attribute loads instead of method calls + list indexing.
+        self.cur = tokens[0]
+        self.peek = tokens[1] if len(tokens) > 1 else tokens[0]
 
-    def current(self):
-        return self.tokens[self.pos]
+    def advance(self):
+        self.pos += 1
+        self.cur = self.peek
+        nxt = self.pos + 1
+        # The token list ends with EOF; peek saturates there.
+        self.peek = self.tokens[nxt] if nxt < len(self.tokens) else self.cur
 
     def eat(self, ttype):
-        tok = self.current()
+        tok = self.cur
         if tok.type != ttype:
-            raise SyntaxError(f"[Parser] Expected {ttype}, got {tok.type} ('{tok.value}') at line {tok.line}")
-        self.pos += 1
+            raise SyntaxError(f"[Parser] Expected {ttype.name}, got {tok.type.name} ('{tok.value}') at line {tok.line}")
+        self.advance()
         return tok
 
     def parse(self):
         stmts = []
-        while self.current().type != TokenType.EOF:
+        while self.cur.type != TokenType.EOF:
             stmts.append(self.statement())
         return BlockNode(stmts)
 
     def statement(self):
-        tok = self.current()
+        tok = self.cur
 
-        if tok.type == "PRINT":
-            self.pos += 1
+        if tok.type == TokenType.PRINT:
+            self.advance()
             self.eat(TokenType.LPAREN)
             expr = self.expression()
             self.eat(TokenType.RPAREN)
             self.optional_semicolon()
             return PrintNode(expr)
 
-        elif tok.type == "IF":
+        elif tok.type == TokenType.IF:
             return self.if_stmt()
 
-        elif tok.type == "WHILE":
+        elif tok.type == TokenType.WHILE:
             return self.while_stmt()
 
-        elif tok.type == TokenType.IDENT and self.tokens[self.pos+1].type == TokenType.ASSIGN:
+        elif tok.type == TokenType.IDENT and self.peek.type == TokenType.ASSIGN:
             name = self.eat(TokenType.IDENT).value
             self.eat(TokenType.ASSIGN)
             val = self.expression()
@@ -225,112 +457,292 @@ class Parser:
             return expr
 
     def optional_semicolon(self):
-        if self.current().type == TokenType.SEMICOL:
-            self.pos += 1
+        if self.cur.type == TokenType.SEMICOL:
+            self.advance()
 
     def if_stmt(self):
-        self.eat("IF")
+        self.eat(TokenType.IF)
         self.eat(TokenType.LPAREN)
         cond = self.expression()
         self.eat(TokenType.RPAREN)
         self.eat(TokenType.LBRACE)
         then_body = []
-        while self.current().type != TokenType.RBRACE:
+        while self.cur.type != TokenType.RBRACE:
             then_body.append(self.statement())
         self.eat(TokenType.RBRACE)
         else_body = None
-        if self.current().type == "ELSE":
-            self.pos += 1
+        if self.cur.type == TokenType.ELSE:
+            self.advance()
             self.eat(TokenType.LBRACE)
             else_body = []
-            while self.current().type != TokenType.RBRACE:
+            while self.cur.type != TokenType.RBRACE:
                 else_body.append(self.statement())
             self.eat(TokenType.RBRACE)
         return IfNode(cond, then_body, else_body)
 
     def while_stmt(self):
-        self.eat("WHILE")
+        self.eat(TokenType.WHILE)
         self.eat(TokenType.LPAREN)
         cond = self.expression()
         self.eat(TokenType.RPAREN)
         self.eat(TokenType.LBRACE)
         body = []
-        while self.current().type != TokenType.RBRACE:
+        while self.cur.type != TokenType.RBRACE:
             body.append(self.statement())
         self.eat(TokenType.RBRACE)
         return WhileNode(cond, body)
 
-    def expression(self):
-        return self.comparison()
-
-    def comparison(self):
-        left = self.additive()
-        ops = {TokenType.EQ: "==", TokenType.NEQ: "!=",
-               TokenType.LT: "<", TokenType.GT: ">",
-               TokenType.LTE: "<=", TokenType.GTE: ">="}
-        while self.current().type in ops:
-            op = ops[self.current().type]
-            self.pos += 1
-            right = self.additive()
-            left = BinOpNode(left, op, right)
-        return left
-
-    def additive(self):
-        left = self.multiplicative()
-        while self.current().type in (TokenType.PLUS, TokenType.MINUS):
-            op = self.current().value
-            self.pos += 1
-            right = self.multiplicative()
-            left = BinOpNode(left, op, right)
-        return left
-
-    def multiplicative(self):
-        left = self.power()
-        while self.current().type in (TokenType.MUL, TokenType.DIV, TokenType.MOD):
-            op = self.current().value
-            self.pos += 1
-            right = self.power()
-            left = BinOpNode(left, op, right)
-        return left
-
-    def power(self):
-        base = self.unary()
-        if self.current().type == TokenType.POW:
-            self.pos += 1
-            exp = self.power()
-            return BinOpNode(base, "**", exp)
-        return base
+    def expression(self, min_prec=0):
+        """Precedence-climbing loop: one stack frame per expression
+        instead of one per precedence level (comparison / additive /
+        multiplicative / power used to be separate methods)."""
+        node = self.unary()
+        while True:
+            entry = PRECEDENCE.get(self.cur.type)
+            if entry is None or entry[0] < min_prec:
+                return node
+            prec, op = entry
+            self.advance()
+            # '**' is right-associative: same precedence may recurse.
+            right = self.expression(prec if op == "**" else prec + 1)
+            node = _fold(BinOpNode(node, op, right))
 
     def unary(self):
-        if self.current().type == TokenType.MINUS:
-            self.pos += 1
-            return UnaryNode("-", self.primary())
+        if self.cur.type == TokenType.MINUS:
+            self.advance()
+            return _fold(UnaryNode("-", self.primary()))
         return self.primary()
 
     def primary(self):
-        tok = self.current()
+        tok = self.cur
         if tok.type == TokenType.NUMBER:
-            self.pos += 1
-            return NumberNode(tok.value)
+            self.advance()
+            return _make_number(tok.value)
         elif tok.type == TokenType.IDENT:
-            self.pos += 1
+            self.advance()
             return VarNode(tok.value)
         elif tok.type == TokenType.LPAREN:
-            self.pos += 1
+            self.advance()
             expr = self.expression()
             self.eat(TokenType.RPAREN)
             return expr
-        raise SyntaxError(f"[Parser] Unexpected token {tok.type} ('{tok.value}') at line {tok.line}")
+        raise SyntaxError(f"[Parser] Unexpected token {tok.type.name} ('{tok.value}') at line {tok.line}")
+
+
+# ─────────────────────────────────────────────
+# AST OPTIMIZATION PASSES
+# ─────────────────────────────────────────────
+
+def _free_vars(node, acc=None):
+    """Variable names read anywhere in an expression subtree."""
+    if acc is None:
+        acc = set()
+    if isinstance(node, VarNode):
+        acc.add(node.name)
+    elif isinstance(node, BinOpNode):
+        _free_vars(node.left, acc)
+        _free_vars(node.right, acc)
+    elif isinstance(node, UnaryNode):
+        _free_vars(node.operand, acc)
+    return acc
+
+
+def _collect_assigned(stmts, acc):
+    """Variable names assigned anywhere in a statement list (recursive)."""
+    for s in stmts:
+        if isinstance(s, AssignNode):
+            acc.add(s.name)
+        elif isinstance(s, IfNode):
+            _collect_assigned(s.then_body, acc)
+            if s.else_body:
+                _collect_assigned(s.else_body, acc)
+        elif isinstance(s, WhileNode):
+            _collect_assigned(s.body, acc)
+        elif isinstance(s, BlockNode):
+            _collect_assigned(s.statements, acc)
+    return acc
+
+
+def _extract_expr(node, assigned, hoisted, counter):
+    """Replace maximal invariant subexpressions (reading at least one
+    variable, none of them assigned in the loop) with a hidden temp."""
+    if isinstance(node, (BinOpNode, UnaryNode)):
+        free = _free_vars(node)
+        if free and not (free & assigned):
+            name = f".inv{next(counter)}"
+            hoisted.append(AssignNode(name, node))
+            return VarNode(name)
+        if isinstance(node, BinOpNode):
+            node.left = _extract_expr(node.left, assigned, hoisted, counter)
+            node.right = _extract_expr(node.right, assigned, hoisted, counter)
+        else:
+            node.operand = _extract_expr(node.operand, assigned, hoisted, counter)
+    return node
+
+
+def _extract_stmt(stmt, assigned, hoisted, counter):
+    if isinstance(stmt, AssignNode):
+        stmt.value = _extract_expr(stmt.value, assigned, hoisted, counter)
+    elif isinstance(stmt, PrintNode):
+        stmt.expr = _extract_expr(stmt.expr, assigned, hoisted, counter)
+    elif isinstance(stmt, IfNode):
+        stmt.condition = _extract_expr(stmt.condition, assigned, hoisted, counter)
+        for s in stmt.then_body:
+            _extract_stmt(s, assigned, hoisted, counter)
+        if stmt.else_body:
+            for s in stmt.else_body:
+                _extract_stmt(s, assigned, hoisted, counter)
+    elif isinstance(stmt, WhileNode):
+        stmt.condition = _extract_expr(stmt.condition, assigned, hoisted, counter)
+        for s in stmt.body:
+            _extract_stmt(s, assigned, hoisted, counter)
+    elif isinstance(stmt, BlockNode):
+        for s in stmt.statements:
+            _extract_stmt(s, assigned, hoisted, counter)
+    else:
+        return _extract_expr(stmt, assigned, hoisted, counter)
+    return stmt
+
+
+def _hoist_stmts(stmts, counter):
+    i = 0
+    while i < len(stmts):
+        s = stmts[i]
+        if isinstance(s, WhileNode):
+            assigned = _collect_assigned(s.body, set())
+            hoisted = []
+            s.condition = _extract_expr(s.condition, assigned, hoisted, counter)
+            s.body = [_extract_stmt(b, assigned, hoisted, counter) for b in s.body]
+            # Temps are evaluated once, right before the loop.
+            stmts[i:i] = hoisted
+            i += len(hoisted)
+            _hoist_stmts(s.body, counter)
+        elif isinstance(s, IfNode):
+            _hoist_stmts(s.then_body, counter)
+            if s.else_body:
+                _hoist_stmts(s.else_body, counter)
+        elif isinstance(s, BlockNode):
+            _hoist_stmts(s.statements, counter)
+        i += 1
+    return stmts
+
+
+def hoist_loop_invariants(block):
+    """Move loop-invariant subexpressions out of while loops: each one is
+    assigned to a hidden '.invN' temp just before the loop (so it is
+    recomputed on every loop *entry*, not every iteration). Trade-off: an
+    invariant that reads a still-undefined variable now raises even when
+    the loop would have run zero times."""
+    _hoist_stmts(block.statements, count())
+    return block
 
 
 # ─────────────────────────────────────────────
 # EVALUATOR / INTERPRETER
 # ─────────────────────────────────────────────
+# Readable reference implementation (tree-walking). `run()` below executes
+# through the bytecode Compiler + VM instead, which avoids the per-node
+# isinstance dispatch on every loop iteration.
+
+def _display(val):
+    """Comparison results print as 0/1, whole-valued floats as ints."""
+    if isinstance(val, bool):
+        return int(val)
+    return int(val) if isinstance(val, float) and val.is_integer() else val
+
+
+# Runaway-loop guard shared by every execution engine. Set to None to run
+# unguarded loops with zero per-iteration overhead (the check is selected
+# at compile time, not tested in the hot path).
+LOOP_LIMIT = 10000
+
 
 class Interpreter:
     def __init__(self):
         self.env = {}
         self.output = []
+        # id(node) -> (node, runner); the node reference keeps the AST
+        # alive so the id cannot be recycled.
+        self._while_cache = {}
+
+    def compile_node(self, node):
+        """Close over a node once and return a zero-arg evaluator for it:
+        repeated execution (loop bodies) pays no isinstance dispatch."""
+        if isinstance(node, NumberNode):
+            value = node.value
+            return lambda: value
+
+        if isinstance(node, VarNode):
+            env = self.env
+            name = node.name
+            def load():
+                if name not in env:
+                    raise NameError(f"[Runtime] Undefined variable '{name}'")
+                return env[name]
+            return load
+
+        if isinstance(node, BinOpNode):
+            left = self.compile_node(node.left)
+            right = self.compile_node(node.right)
+            op_fn = node.op_fn
+            return lambda: op_fn(left(), right())
+
+        if isinstance(node, UnaryNode):
+            operand = self.compile_node(node.operand)
+            return (lambda: -operand()) if node.op == "-" else operand
+
+        if isinstance(node, AssignNode):
+            env = self.env
+            name = node.name
+            value = self.compile_node(node.value)
+            def assign():
+                val = env[name] = value()
+                return val
+            return assign
+
+        if isinstance(node, PrintNode):
+            expr = self.compile_node(node.expr)
+            output = self.output
+            def do_print():
+                result = _display(expr())
+                print(f"  >> {result}")
+                output.append(result)
+                return result
+            return do_print
+
+        if isinstance(node, IfNode):
+            cond = self.compile_node(node.condition)
+            then_body = [self.compile_node(s) for s in node.then_body]
+            else_body = [self.compile_node(s) for s in node.else_body or []]
+            def branch():
+                for step in (then_body if cond() else else_body):
+                    step()
+            return branch
+
+        if isinstance(node, WhileNode):
+            return self._compile_while(node)
+
+        return lambda: self.eval(node)
+
+    def _compile_while(self, node):
+        cond = self.compile_node(node.condition)
+        body = [self.compile_node(s) for s in node.body]
+        if LOOP_LIMIT is None:
+            def run_loop():
+                while cond():
+                    for step in body:
+                        step()
+        else:
+            def run_loop():
+                iterations = 0
+                while cond():
+                    iterations += 1
+                    if iterations > LOOP_LIMIT:
+                        raise RuntimeError(
+                            f"Infinite loop detected (>{LOOP_LIMIT} iterations)")
+                    for step in body:
+                        step()
+        return run_loop
 
     def eval(self, node):
         if isinstance(node, BlockNode):
@@ -355,29 +767,14 @@ class Interpreter:
         elif isinstance(node, BinOpNode):
             l = self.eval(node.left)
             r = self.eval(node.right)
-            ops = {
-                "+": lambda a, b: a + b,
-                "-": lambda a, b: a - b,
-                "*": lambda a, b: a * b,
-                "/": lambda a, b: a / b if b != 0 else (_ for _ in ()).throw(ZeroDivisionError("Division by zero")),
-                "%": lambda a, b: a % b,
-                "**": lambda a, b: a ** b,
-                "==": lambda a, b: int(a == b),
-                "!=": lambda a, b: int(a != b),
-                "<": lambda a, b: int(a < b),
-                ">": lambda a, b: int(a > b),
-                "<=": lambda a, b: int(a <= b),
-                ">=": lambda a, b: int(a >= b),
-            }
-            return ops[node.op](l, r)
+            return node.op_fn(l, r)
 
         elif isinstance(node, UnaryNode):
             val = self.eval(node.operand)
             return -val if node.op == "-" else val
 
         elif isinstance(node, PrintNode):
-            val = self.eval(node.expr)
-            result = int(val) if isinstance(val, float) and val.is_integer() else val
+            result = _display(self.eval(node.expr))
             print(f"  >> {result}")
             self.output.append(result)
             return result
@@ -391,29 +788,428 @@ class Interpreter:
                     self.eval(stmt)
 
         elif isinstance(node, WhileNode):
-            iterations = 0
-            while self.eval(node.condition):
-                iterations += 1
-                if iterations > 10000:
-                    raise RuntimeError("Infinite loop detected (>10000 iterations)")
-                for stmt in node.body:
-                    self.eval(stmt)
+            cached = self._while_cache.get(id(node))
+            if cached is None:
+                cached = self._while_cache[id(node)] = (node, self._compile_while(node))
+            cached[1]()
 
 
 # ─────────────────────────────────────────────
-# REPL + FILE MODE
+# BYTECODE COMPILER + VM
 # ─────────────────────────────────────────────
 
-def run(source, interpreter=None):
-    if interpreter is None:
-        interpreter = Interpreter()
+(OP_CONST, OP_LOAD, OP_STORE, OP_POP, OP_NEG, OP_PRINT,
+ OP_JUMP, OP_JUMP_IF_FALSE, OP_SETUP_LOOP, OP_LOOP,
+ OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_MOD, OP_POW,
+ OP_EQ, OP_NEQ, OP_LT, OP_GT, OP_LTE, OP_GTE) = range(22)
+
+BIN_OPCODES = {
+    "+": OP_ADD, "-": OP_SUB, "*": OP_MUL, "/": OP_DIV,
+    "%": OP_MOD, "**": OP_POW,
+    "==": OP_EQ, "!=": OP_NEQ, "<": OP_LT, ">": OP_GT,
+    "<=": OP_LTE, ">=": OP_GTE,
+}
+
+
+# Marks a slot whose variable has not been assigned yet.
+_UNSET = object()
+
+
+class Compiler:
+    """Flattens an AST into a list of (opcode, arg) tuples. Variable names
+    are resolved to integer slot indices here, so the VM reads and writes
+    a flat list instead of hashing names; pass the owning VM's slot map to
+    keep indices stable across REPL lines."""
+
+    def __init__(self, slots=None):
+        self.code = []
+        self.slots = {} if slots is None else slots
+
+    def slot(self, name):
+        index = self.slots.get(name)
+        if index is None:
+            index = self.slots[name] = len(self.slots)
+        return index
+
+    def emit(self, op, arg=None):
+        self.code.append((op, arg))
+        return len(self.code) - 1
+
+    def patch(self, index, arg):
+        self.code[index] = (self.code[index][0], arg)
+
+    def compile(self, node):
+        self.compile_node(node)
+        return self.code
+
+    def compile_stmt(self, node):
+        self.compile_node(node)
+        # Bare expression statements leave their value on the stack.
+        if not isinstance(node, (BlockNode, AssignNode, PrintNode,
+                                 IfNode, WhileNode)):
+            self.emit(OP_POP)
+
+    def compile_node(self, node):
+        if isinstance(node, BlockNode):
+            for stmt in node.statements:
+                self.compile_stmt(stmt)
+
+        elif isinstance(node, NumberNode):
+            self.emit(OP_CONST, node.value)
+
+        elif isinstance(node, VarNode):
+            self.emit(OP_LOAD, self.slot(node.name))
+
+        elif isinstance(node, AssignNode):
+            self.compile_node(node.value)
+            self.emit(OP_STORE, self.slot(node.name))
+
+        elif isinstance(node, BinOpNode):
+            self.compile_node(node.left)
+            self.compile_node(node.right)
+            self.emit(BIN_OPCODES[node.op])
+
+        elif isinstance(node, UnaryNode):
+            self.compile_node(node.operand)
+            if node.op == "-":
+                self.emit(OP_NEG)
+
+        elif isinstance(node, PrintNode):
+            self.compile_node(node.expr)
+            self.emit(OP_PRINT)
+
+        elif isinstance(node, IfNode):
+            self.compile_node(node.condition)
+            jump_else = self.emit(OP_JUMP_IF_FALSE)
+            for stmt in node.then_body:
+                self.compile_stmt(stmt)
+            if node.else_body:
+                jump_end = self.emit(OP_JUMP)
+                self.patch(jump_else, len(self.code))
+                for stmt in node.else_body:
+                    self.compile_stmt(stmt)
+                self.patch(jump_end, len(self.code))
+            else:
+                self.patch(jump_else, len(self.code))
+
+        elif isinstance(node, WhileNode):
+            setup = self.emit(OP_SETUP_LOOP)
+            cond_start = len(self.code)
+            self.compile_node(node.condition)
+            jump_end = self.emit(OP_JUMP_IF_FALSE)
+            for stmt in node.body:
+                self.compile_stmt(stmt)
+            backedge = self.emit(OP_LOOP, cond_start)
+            self.patch(setup, backedge)
+            self.patch(jump_end, len(self.code))
+
+
+class VM:
+    """Stack machine over the Compiler's opcode list. Holds the variable
+    environment, so one VM instance persists across REPL lines."""
+
+    def __init__(self):
+        self.slots = {}
+        self.frame = []
+        self.output = []
+
+    @property
+    def env(self):
+        """name -> value view of the slot frame (for the REPL's `vars`).
+        Hidden '.invN' hoisting temps are not user variables; skip them."""
+        return {name: self.frame[i] for name, i in self.slots.items()
+                if self.frame[i] is not _UNSET and not name.startswith('.')}
+
+    def _name_of(self, slot):
+        return next(n for n, i in self.slots.items() if i == slot)
+
+    def set(self, name, value):
+        """Store a value by name (used by the numba backend to write
+        results back into the slot frame)."""
+        index = self.slots.get(name)
+        if index is None:
+            index = self.slots[name] = len(self.slots)
+        if len(self.frame) <= index:
+            self.frame.extend([_UNSET] * (index + 1 - len(self.frame)))
+        self.frame[index] = value
+
+    def run(self, code):
+        # Grow the frame to cover any slots the compiler just added.
+        if len(self.frame) < len(self.slots):
+            self.frame.extend([_UNSET] * (len(self.slots) - len(self.frame)))
+        frame = self.frame
+        stack = []
+        pc = 0
+        n = len(code)
+        loop_counts = {}
+
+        while pc < n:
+            op, arg = code[pc]
+            pc += 1
+
+            if op == OP_CONST:
+                stack.append(arg)
+            elif op == OP_LOAD:
+                val = frame[arg]
+                if val is _UNSET:
+                    raise NameError(f"[Runtime] Undefined variable '{self._name_of(arg)}'")
+                stack.append(val)
+            elif op == OP_STORE:
+                frame[arg] = stack.pop()
+            elif op == OP_POP:
+                stack.pop()
+            elif op == OP_NEG:
+                stack[-1] = -stack[-1]
+            elif op == OP_PRINT:
+                result = _display(stack.pop())
+                print(f"  >> {result}")
+                self.output.append(result)
+            elif op == OP_JUMP:
+                pc = arg
+            elif op == OP_JUMP_IF_FALSE:
+                if not stack.pop():
+                    pc = arg
+            elif op == OP_SETUP_LOOP:
+                loop_counts[arg] = 0
+            elif op == OP_LOOP:
+                count = loop_counts[pc - 1] + 1
+                if LOOP_LIMIT is not None and count > LOOP_LIMIT:
+                    raise RuntimeError(
+                        f"Infinite loop detected (>{LOOP_LIMIT} iterations)")
+                loop_counts[pc - 1] = count
+                pc = arg
+            elif op == OP_DIV:
+                r = stack.pop()
+                if r == 0:
+                    raise ZeroDivisionError("Division by zero")
+                stack[-1] = stack[-1] / r
+            elif op == OP_ADD:
+                r = stack.pop()
+                stack[-1] = stack[-1] + r
+            elif op == OP_SUB:
+                r = stack.pop()
+                stack[-1] = stack[-1] - r
+            elif op == OP_MUL:
+                r = stack.pop()
+                stack[-1] = stack[-1] * r
+            elif op == OP_MOD:
+                r = stack.pop()
+                stack[-1] = stack[-1] % r
+            elif op == OP_POW:
+                r = stack.pop()
+                stack[-1] = stack[-1] ** r
+            elif op == OP_EQ:
+                r = stack.pop()
+                stack[-1] = stack[-1] == r
+            elif op == OP_NEQ:
+                r = stack.pop()
+                stack[-1] = stack[-1] != r
+            elif op == OP_LT:
+                r = stack.pop()
+                stack[-1] = stack[-1] < r
+            elif op == OP_GT:
+                r = stack.pop()
+                stack[-1] = stack[-1] > r
+            elif op == OP_LTE:
+                r = stack.pop()
+                stack[-1] = stack[-1] <= r
+            elif op == OP_GTE:
+                r = stack.pop()
+                stack[-1] = stack[-1] >= r
+
+
+# ─────────────────────────────────────────────
+# OPTIONAL NUMBA BACKEND
+# ─────────────────────────────────────────────
+# Purely numeric programs can be lowered to Python source and @njit-
+# compiled, so hot while loops run as machine code instead of VM
+# dispatch. Anything the translator can't prove safe falls back to the
+# VM: prints inside loops, '/' and '%' (numba's zero-division behaviour
+# differs from ours), and variables read before the program assigns them
+# (e.g. values carried over from earlier REPL lines). Note that jitted
+# integer arithmetic is 64-bit, so programs relying on Python's big ints
+# are better served by the VM anyway.
+
+_CMP_OPS = {"==", "!=", "<", ">", "<=", ">="}
+
+_NUMBA_CACHE = {}
+
+
+def _py_name(name):
+    # 'v_' prefix keeps user variables and '.invN' hoisting temps from
+    # colliding with generated locals like _out.
+    return "v_" + name.replace('.', '_')
+
+
+def _numba_expr_safe(node, assigned):
+    if isinstance(node, NumberNode):
+        return True
+    if isinstance(node, VarNode):
+        return node.name in assigned
+    if isinstance(node, BinOpNode):
+        if node.op in ('/', '%'):
+            return False
+        return (_numba_expr_safe(node.left, assigned)
+                and _numba_expr_safe(node.right, assigned))
+    if isinstance(node, UnaryNode):
+        return _numba_expr_safe(node.operand, assigned)
+    return False
+
+
+def _numba_safe_stmts(stmts, assigned, in_loop):
+    """Definite-assignment + feature walk; True if every statement can be
+    translated without changing behaviour."""
+    for s in stmts:
+        if isinstance(s, AssignNode):
+            if not _numba_expr_safe(s.value, assigned):
+                return False
+            assigned.add(s.name)
+        elif isinstance(s, PrintNode):
+            if in_loop or not _numba_expr_safe(s.expr, assigned):
+                return False
+        elif isinstance(s, IfNode):
+            if not _numba_expr_safe(s.condition, assigned):
+                return False
+            then_set = set(assigned)
+            if not _numba_safe_stmts(s.then_body, then_set, in_loop):
+                return False
+            else_set = set(assigned)
+            if s.else_body and not _numba_safe_stmts(s.else_body, else_set, in_loop):
+                return False
+            # Only vars assigned on both paths are definitely assigned.
+            assigned |= (then_set & else_set)
+        elif isinstance(s, WhileNode):
+            if not _numba_expr_safe(s.condition, assigned):
+                return False
+            if not _numba_safe_stmts(s.body, set(assigned), True):
+                return False
+        elif isinstance(s, BlockNode):
+            if not _numba_safe_stmts(s.statements, assigned, in_loop):
+                return False
+        else:
+            if not _numba_expr_safe(s, assigned):
+                return False
+    return True
+
+
+def _numba_expr(node):
+    if isinstance(node, NumberNode):
+        return repr(node.value)
+    if isinstance(node, VarNode):
+        return _py_name(node.name)
+    if isinstance(node, UnaryNode):
+        operand = _numba_expr(node.operand)
+        return f"(-{operand})" if node.op == "-" else operand
+    left = _numba_expr(node.left)
+    right = _numba_expr(node.right)
+    if node.op in _CMP_OPS:
+        return f"(1 if {left} {node.op} {right} else 0)"
+    return f"({left} {node.op} {right})"
+
+
+def _numba_stmts(stmts, lines, indent, loops):
+    pad = "    " * indent
+    for s in stmts:
+        if isinstance(s, AssignNode):
+            lines.append(f"{pad}{_py_name(s.name)} = {_numba_expr(s.value)}")
+        elif isinstance(s, PrintNode):
+            lines.append(f"{pad}_out.append({_numba_expr(s.expr)})")
+        elif isinstance(s, IfNode):
+            lines.append(f"{pad}if {_numba_expr(s.condition)}:")
+            _numba_stmts(s.then_body, lines, indent + 1, loops)
+            if s.else_body:
+                lines.append(f"{pad}else:")
+                _numba_stmts(s.else_body, lines, indent + 1, loops)
+        elif isinstance(s, WhileNode):
+            lines.append(f"{pad}while {_numba_expr(s.condition)}:")
+            if LOOP_LIMIT is not None:
+                guard = f"_it{next(loops)}"
+                lines.insert(len(lines) - 1, f"{pad}{guard} = 0")
+                lines.append(f"{pad}    {guard} += 1")
+                lines.append(f"{pad}    if {guard} > {LOOP_LIMIT}:")
+                lines.append(f"{pad}        raise RuntimeError("
+                             f"'Infinite loop detected (>{LOOP_LIMIT} iterations)')")
+            _numba_stmts(s.body, lines, indent + 1, loops)
+        elif isinstance(s, BlockNode):
+            _numba_stmts(s.statements, lines, indent, loops)
+        else:
+            lines.append(f"{pad}{_numba_expr(s)}")
+
+
+def _numba_compile(ast):
+    """Translate a numba-safe program into a zero-arg jitted function
+    returning (prints, final values of user variables)."""
+    names = sorted(n for n in _collect_assigned(ast.statements, set())
+                   if not n.startswith('.'))
+    lines = ["def _prog():", "    _out = []"]
+    _numba_stmts(ast.statements, lines, 1, count())
+    results = ", ".join(_py_name(n) for n in names)
+    lines.append(f"    return (_out, ({results},))" if names
+                 else "    return (_out, ())")
+    source = "\n".join(lines)
+    fn = _NUMBA_CACHE.get(source)
+    if fn is None:
+        namespace = {}
+        exec(source, namespace)
+        fn = _NUMBA_CACHE[source] = njit(namespace["_prog"])
+    return fn, names
+
+
+def try_numba(ast, vm):
+    """Run via the numba backend if possible; False means use the VM."""
+    if njit is None or not _numba_safe_stmts(ast.statements, set(), False):
+        return False
     try:
+        fn, names = _numba_compile(ast)
+        printed, values = fn()
+    except RuntimeError:
+        raise
+    except Exception:
+        return False          # type inference failed etc. -- use the VM
+    for name, value in zip(names, values):
+        vm.set(name, value)
+    for val in printed:
+        result = _display(val)
+        print(f"  >> {result}")
+        vm.output.append(result)
+    return True
+
+
+# ─────────────────────────────────────────────
+# REPL + FILE MODE
+# ─────────────────────────────────────────────
+
+# Re-running the same source (REPL loops, repeated sample programs) skips
+# lexing/parsing entirely. ASTs are never mutated after the optimization
+# passes, so sharing them between runs is safe.
+_AST_CACHE = {}
+_AST_CACHE_MAX = 128
+
+
+def _parse_cached(source):
+    ast = _AST_CACHE.get(source)
+    if ast is None:
         tokens = Lexer(source).tokenize()
-        ast = Parser(tokens).parse()
-        interpreter.eval(ast)
+        ast = hoist_loop_invariants(Parser(tokens).parse())
+        if len(_AST_CACHE) >= _AST_CACHE_MAX:
+            # Evict the least recently used entry (first in dict order).
+            _AST_CACHE.pop(next(iter(_AST_CACHE)))
+    else:
+        del _AST_CACHE[source]          # re-insert to mark as recent
+    _AST_CACHE[source] = ast
+    return ast
+
+
+def run(source, vm=None):
+    if vm is None:
+        vm = VM()
+    try:
+        ast = _parse_cached(source)
+        if not try_numba(ast, vm):
+            vm.run(Compiler(vm.slots).compile(ast))
     except (SyntaxError, NameError, ZeroDivisionError, RuntimeError) as e:
         print(f"  ❌ {e}")
-    return interpreter
+    return vm
 
 
 def show_tokens(source):
@@ -422,7 +1218,7 @@ def show_tokens(source):
         print("\n  📋 Tokens:")
         for t in tokens:
             if t.type != TokenType.EOF:
-                print(f"    {t.type:12s} | {repr(t.value)}")
+                print(f"    {t.type.name:12s} | {repr(t.value)}")
     except SyntaxError as e:
         print(f"  ❌ {e}")
 
@@ -487,7 +1283,7 @@ def main():
     print("  🔧 Mini Compiler & Interpreter")
     print("=" * 55)
 
-    interpreter = Interpreter()
+    vm = VM()
 
     while True:
         print("\n  1. REPL (interactive mode)")
@@ -507,12 +1303,12 @@ def main():
                     if line == "exit":
                         break
                     elif line == "reset":
-                        interpreter = Interpreter()
+                        vm = VM()
                         print("  Variables cleared.")
                     elif line == "vars":
-                        print(f"  Variables: {interpreter.env}")
+                        print(f"  Variables: {vm.env}")
                     elif line:
-                        run(line, interpreter)
+                        run(line, vm)
                 except (KeyboardInterrupt, EOFError):
                     break
 